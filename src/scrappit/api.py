@@ -17,11 +17,14 @@
 from dataclasses import dataclass, field
 from enum import Enum
 from http.cookiejar import DefaultCookiePolicy
-from time import sleep, time
+from random import choice, uniform
+from threading import Lock
+from time import monotonic, sleep
 from typing import ClassVar
 
-from fake_useragent import UserAgent
-from requests import Session, Timeout
+from orjson import loads
+from requests import Request, Session, Timeout
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RetryError
 
 from .common import JSON
@@ -83,57 +86,139 @@ class RedditAPICommentsSort(Enum):
     QA = RedditAPIItem("qa", 2 / 6)
 
 
+@dataclass
+class TokenBucket:
+    capacity: float
+    rate: float
+    tokens: float = field(init=False)
+    reserved: int = field(default=0, init=False)
+    reset_time: float = field(default=0, init=False)
+    last: float = field(default_factory=monotonic, init=False)
+
+    def __post_init__(self) -> None:
+        self.tokens = self.capacity
+
+    def acquire(self) -> float:
+        now = monotonic()
+
+        if self.reset_time and now >= self.reset_time:
+            self.tokens = self.capacity
+            self.reset_time = 0
+        else:
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+
+        self.tokens -= 1
+        self.reserved += 1
+        self.last = now
+
+        if self.tokens >= 0:
+            return 0
+
+        wait = -self.tokens / self.rate
+
+        if self.reset_time:
+            wait = min(wait, self.reset_time - now)
+
+        return wait
+
+    def release(self) -> None:
+        self.reserved -= 1
+
+    def update(self, remaining: float, used: float, reset: float, now: float) -> None:
+        self.capacity = max(remaining + used, 1)
+        self.tokens = remaining - self.reserved
+        self.rate = max(remaining, 1) / max(reset, 1)
+        self.reset_time = now + reset
+        self.last = now
+
+
 @dataclass
 class RedditAPI:
-    BASE_URL: ClassVar[str] = "https://reddit.com"
+    BASE_URL: ClassVar[str] = "https://www.reddit.com"
     TIMEOUT: ClassVar[int] = 10
     MAX_TRIES: ClassVar[int] = 3
+    JITTER: ClassVar[float] = 0.5
+    POOL_SIZE: ClassVar[int] = 32
+    USER_AGENTS: ClassVar[tuple[str, ...]] = (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36",
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:131.0) Gecko/20100101 Firefox/131.0",
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36 Edg/129.0.0.0",
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36",
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/18.0 Safari/605.1.15",
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 14.7; rv:131.0) Gecko/20100101 Firefox/131.0",
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36",
+        "Mozilla/5.0 (X11; Linux x86_64; rv:131.0) Gecko/20100101 Firefox/131.0"
+    )
+    RATE_LIMIT: ClassVar[int] = 100
+    RATE_PERIOD: ClassVar[int] = 600
 
     session: Session = field(default_factory=Session, init=False, repr=False)
-    user_agent: UserAgent = field(default_factory=UserAgent, init=False, repr=False)
-    requests_remaining: bool = field(default=True, init=False, repr=False)
+    bucket: TokenBucket = field(init=False, repr=False)
     reset_time: float = field(default=0, init=False, repr=False)
+    throttle_streak: int = field(default=0, init=False, repr=False)
+    lock: Lock = field(default_factory=Lock, init=False, repr=False)
 
     def __post_init__(self) -> None:
-        self.session.headers = {"User-Agent": self.user_agent.random}
+        self.session.headers["User-Agent"] = self.USER_AGENTS[0]
+        self.session.mount(self.BASE_URL, HTTPAdapter(pool_connections=1, pool_maxsize=self.POOL_SIZE))
         self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        self.bucket = TokenBucket(self.RATE_LIMIT, self.RATE_LIMIT / self.RATE_PERIOD)
 
     def get(self, endpoint: str, **params: str) -> JSON:
+        url = f"{self.BASE_URL}{endpoint}.json"
         params["raw_json"] = "1"
+        request = self.session.prepare_request(Request("GET", url, params=params))
+        settings = self.session.merge_environment_settings(request.url, {}, None, None, None)
 
         for _ in range(self.MAX_TRIES):
-            now = time()
+            with self.lock:
+                wait = self.bucket.acquire()
+
+            if wait:
+                sleep(wait)
 
-            if now > self.reset_time:
-                self.requests_remaining = True
-            elif not self.requests_remaining:
-                sleep(self.reset_time - now)
-                self.session.headers["User-Agent"] = self.user_agent.random
-                self.requests_remaining = True
+            with self.lock:
+                self.bucket.release()
 
             try:
-                response = self.session.get(f"{self.BASE_URL}{endpoint}.json", params=params, timeout=self.TIMEOUT)
+                response = self.session.send(request, timeout=self.TIMEOUT, **settings)
             except Timeout:
                 continue
 
             if response.status_code not in (200, 429):
                 response.raise_for_status()
 
-            now = time()
-            self.requests_remaining = bool(float(response.headers["X-Ratelimit-Remaining"]))
-            self.reset_time = now + int(response.headers["X-Ratelimit-Reset"])
+            now = monotonic()
+
+            if "X-Ratelimit-Remaining" in response.headers and "X-Ratelimit-Reset" in response.headers:
+                remaining = float(response.headers["X-Ratelimit-Remaining"])
+                used = float(response.headers.get("X-Ratelimit-Used", "0"))
+                reset = float(response.headers["X-Ratelimit-Reset"])
+
+                with self.lock:
+                    if response.status_code != 429:
+                        self.bucket.update(remaining, used, reset, now)
+
+                    self.reset_time = now + reset
 
             if response.status_code == 429:
-                sleep(max(self.TIMEOUT, self.reset_time - now))
-                self.session.headers["User-Agent"] = self.user_agent.random
+                with self.lock:
+                    delay = min(max(self.TIMEOUT, self.reset_time - now), self.TIMEOUT * 2**self.throttle_streak)
+                    self.throttle_streak += 1
+
+                sleep(delay + uniform(0, self.JITTER))
+                self.session.headers["User-Agent"] = request.headers["User-Agent"] = choice(self.USER_AGENTS)
                 continue
 
-            return response.json()
+            with self.lock:
+                self.throttle_streak = 0
+
+            return loads(response.content)
 
         raise RetryError()
 
     def listing(self, endpoint: str, before: str | None = None, after: str | None = None, **params: str) -> JSON:
-        params["limit"] = "100"
+        params.setdefault("limit", "100")
 
         if before:
             params["before"] = before
@@ -15,74 +15,215 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 from dataclasses import dataclass, field
-from queue import Empty, PriorityQueue, Queue
-from threading import Event, Thread
-from time import sleep
+from heapq import heappop, heappush
+from queue import Empty, Queue
+from sys import intern
+from threading import Condition, Event, Thread
+from typing import Callable
+
+from orjson import dumps, loads
 
 from .common import JSON
 from .api import RedditAPITask, RedditAPISubredditSort, RedditAPIT, RedditAPIUserWhere, RedditAPIUserSort, RedditAPICommentsSort, RedditAPI
 
 
-@dataclass
+@dataclass(slots=True)
 class ScrappitTask:
     name: str = field(compare=False)
     args: tuple = field(compare=False)
     kwargs: dict = field(default_factory=dict, compare=False)
     priority: float = 0
     task_id: int = field(default=0, init=False, repr=False)
+    origin_id: int | None = field(default=None, init=False, repr=False)
+
+    def key(self) -> tuple | None:
+        key = (self.name, self.args, frozenset(self.kwargs.items()))
 
+        try:
+            hash(key)
+        except TypeError:
+            return None
 
-@dataclass
+        return key
+
+
+@dataclass(slots=True)
 class ScrappitResult:
     task: ScrappitTask
     value: JSON | Exception
 
 
 class ScrappitScheduler(Thread):
-    IDLE_SLEEP: float = 1 / 60
+    PAGINATED_TASKS: tuple[str, ...] = (RedditAPITask.LISTING.value.name, RedditAPITask.R.value.name, RedditAPITask.USER.value.name)
+    RESULT_QUEUE_SIZE: int = 64
+
+    def __init__(self, workers: int = 1) -> None:
+        if workers < 1:
+            raise ValueError(f"Invalid number of workers: {workers}")
 
-    def __init__(self) -> None:
         super().__init__()
+        self.workers: int = workers
         self.api: RedditAPI = RedditAPI()
-        self.task_queue: PriorityQueue[ScrappitTask] = PriorityQueue()
+        self.dispatch: dict[str, Callable[..., JSON]] = {task.value.name: getattr(self.api, task.value.name) for task in RedditAPITask}
+        self.task_heap: list[list] = []
+        self.task_entries: dict[int, list] = {}
+        self.task_condition: Condition = Condition()
         self.task_id: int = 0
-        self.result_queue: Queue[ScrappitResult] = Queue()
+        self.pending_tasks: dict[tuple, list[ScrappitTask]] = {}
+        self.task_pages: dict[int, int] = {}
+        self.result_queue: Queue[ScrappitResult] = Queue(self.RESULT_QUEUE_SIZE)
+        self.result_condition: Condition = Condition()
         self.running: Event = Event()
 
     def run(self) -> None:
         self.running.set()
+        threads = [Thread(target=self.work) for _ in range(self.workers - 1)]
 
-        while self.running.is_set():
-            if not self.task_queue.empty():
-                task = self.task_queue.get()
+        for thread in threads:
+            thread.start()
 
-                try:
-                    json = getattr(self.api, task.name)(*task.args, **task.kwargs)
-                    self.result_queue.put(ScrappitResult(task, json))
-                except Exception as e:
-                    self.result_queue.put(ScrappitResult(task, e))
+        self.work()
 
-                self.task_queue.task_done()
-            else:
-                sleep(self.IDLE_SLEEP)
+        for thread in threads:
+            thread.join()
+
+    def work(self) -> None:
+        while True:
+            task = self.pop_task()
+
+            if task is None:
+                break
+
+            try:
+                value = self.dispatch[task.name](*task.args, **task.kwargs)
+            except Exception as e:
+                value = e
+
+            with self.task_condition:
+                tasks = self.pending_tasks.pop(task.key(), [task])
+
+            try:
+                cursor = self.next_cursor(task, value)
+                raw = dumps(value) if len(tasks) > 1 and not isinstance(value, Exception) else None
+            except Exception as e:
+                value, cursor, raw = e, None, None
+
+            for i, task in enumerate(tasks):
+                self.put_result(ScrappitResult(task, value if i == 0 or raw is None else loads(raw)))
+                self.put_next_page(task, cursor)
+
+    def pop_task(self) -> ScrappitTask | None:
+        with self.task_condition:
+            while self.running.is_set():
+                if not self.task_heap:
+                    self.task_condition.wait()
+                    continue
+
+                _, task_id, task = heappop(self.task_heap)
+
+                if task is not None:
+                    del self.task_entries[task_id]
+                    return task
+
+        return None
 
     def stop(self) -> None:
-        self.running.clear()
+        with self.task_condition:
+            self.running.clear()
+            self.task_condition.notify_all()
+
+        with self.result_condition:
+            self.result_condition.notify_all()
+
+    def put_task(self, task: ScrappitTask, max_pages: int = 1) -> ScrappitTask:
+        if task.name not in self.dispatch:
+            raise ValueError(f"Unknown task: {task.name}")
+
+        if max_pages > 1 and task.name not in self.PAGINATED_TASKS:
+            raise ValueError(f"Task cannot be paginated: {task.name}")
+
+        with self.task_condition:
+            task.task_id = self.task_id
+            self.task_id += 1
+
+            if task.origin_id is None:
+                task.origin_id = task.task_id
+
+            if max_pages > 1:
+                self.task_pages[task.task_id] = max_pages
+
+            key = task.key()
+
+            if key is not None and key in self.pending_tasks:
+                tasks = self.pending_tasks[key]
+                tasks.append(task)
+                entry = self.task_entries.get(tasks[0].task_id)
+
+                if entry is not None and task.priority < entry[0]:
+                    entry[2] = None
+                    self.push_entry(task.priority, tasks[0])
+            else:
+                if key is not None:
+                    self.pending_tasks[key] = [task]
+
+                self.push_entry(task.priority, task)
+                self.task_condition.notify()
 
-    def put_task(self, task: ScrappitTask) -> ScrappitTask:
-        task.task_id = self.task_id
-        self.task_id += 1
-        self.task_queue.put(task)
         return task
 
+    def push_entry(self, priority: float, task: ScrappitTask) -> None:
+        entry = [priority, task.task_id, task]
+        self.task_entries[task.task_id] = entry
+        heappush(self.task_heap, entry)
+
+    def put_result(self, result: ScrappitResult) -> None:
+        with self.result_condition:
+            while self.result_queue.full() and self.running.is_set():
+                self.result_condition.wait()
+
+            if not self.result_queue.full():
+                self.result_queue.put_nowait(result)
+
+    def next_cursor(self, task: ScrappitTask, value: JSON | Exception) -> str | None:
+        if task.name not in self.PAGINATED_TASKS or not isinstance(value, dict) or not isinstance(value.get("data"), dict):
+            return None
+
+        cursor = value["data"].get("before" if task.args[-2] else "after")
+
+        if not cursor or not isinstance(cursor, str):
+            return None
+
+        return intern(cursor)
+
+    def put_next_page(self, task: ScrappitTask, cursor: str | None) -> None:
+        with self.task_condition:
+            max_pages = self.task_pages.pop(task.task_id, 1)
+
+        if max_pages == 1 or cursor is None:
+            return
+
+        before, after = (cursor, None) if task.args[-2] else (None, cursor)
+        next_task = ScrappitTask(task.name, task.args[:-2] + (before, after), task.kwargs, task.priority)
+        next_task.origin_id = task.origin_id
+        self.put_task(next_task, max_pages - 1)
+
+    @staticmethod
+    def intern_cursors(before: str | None, after: str | None) -> tuple[str | None, str | None]:
+        return intern(before) if before else None, intern(after) if after else None
+
     def get_result(self) -> ScrappitResult | None:
         try:
             result = self.result_queue.get_nowait()
-            self.result_queue.task_done()
-            return result
         except Empty:
             return None
 
+        self.result_queue.task_done()
+
+        with self.result_condition:
+            self.result_condition.notify()
+
+        return result
+
     def get(self, endpoint: str, priority: float | None = None, **params: str) -> ScrappitTask:
         if priority is None:
             priority = RedditAPITask.GET.value.priority
@@ -90,12 +231,20 @@ class ScrappitScheduler(Thread):
         return self.put_task(ScrappitTask(RedditAPITask.GET.value.name, (endpoint,), params, priority))
 
     def listing(
-        self, endpoint: str, before: str | None = None, after: str | None = None, priority: float | None = None, **params: str
+        self,
+        endpoint: str,
+        before: str | None = None,
+        after: str | None = None,
+        priority: float | None = None,
+        max_pages: int = 1,
+        **params: str
     ) -> ScrappitTask:
+        before, after = self.intern_cursors(before, after)
+
         if priority is None:
             priority = RedditAPITask.LISTING.value.priority
 
-        return self.put_task(ScrappitTask(RedditAPITask.LISTING.value.name, (endpoint, before, after), params, priority))
+        return self.put_task(ScrappitTask(RedditAPITask.LISTING.value.name, (endpoint, before, after), params, priority), max_pages)
 
     def r_about(self, subreddit: str, priority: float | None = None) -> ScrappitTask:
         if priority is None:
@@ -110,8 +259,11 @@ class ScrappitScheduler(Thread):
         t: RedditAPIT = RedditAPIT.DAY,
         before: str | None = None,
         after: str | None = None,
-        priority: float | None = None
+        priority: float | None = None,
+        max_pages: int = 1
     ) -> ScrappitTask:
+        before, after = self.intern_cursors(before, after)
+
         if priority is None:
             priority = RedditAPITask.R.value.priority + sort.value.priority
 
@@ -121,7 +273,7 @@ class ScrappitScheduler(Thread):
             else:
                 priority /= 2
 
-        return self.put_task(ScrappitTask(RedditAPITask.R.value.name, (subreddit, sort, t, before, after), priority=priority))
+        return self.put_task(ScrappitTask(RedditAPITask.R.value.name, (subreddit, sort, t, before, after), priority=priority), max_pages)
 
     def user_about(self, username: str, priority: float | None = None) -> ScrappitTask:
         if priority is None:
@@ -137,8 +289,11 @@ class ScrappitScheduler(Thread):
         t: RedditAPIT = RedditAPIT.ALL,
         before: str | None = None,
         after: str | None = None,
-        priority: float | None = None
+        priority: float | None = None,
+        max_pages: int = 1
     ) -> ScrappitTask:
+        before, after = self.intern_cursors(before, after)
+
         if priority is None:
             priority = RedditAPITask.USER.value.priority + where.value.priority + sort.value.priority
 
@@ -148,7 +303,7 @@ class ScrappitScheduler(Thread):
             else:
                 priority /= 3
 
-        return self.put_task(ScrappitTask(RedditAPITask.USER.value.name, (username, where, sort, t, before, after), priority=priority))
+        return self.put_task(ScrappitTask(RedditAPITask.USER.value.name, (username, where, sort, t, before, after), priority=priority), max_pages)
 
     def comments(
         self, article: str, sort: RedditAPICommentsSort = RedditAPICommentsSort.CONFIDENCE, comment: str | None = None, priority: float | None = None
@@ -0,0 +1,111 @@
+# Scrappit, Simple Reddit Scraper
+# Copyright (C) 2024  Natan Junges <natanajunges@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from time import monotonic
+
+import pytest
+from requests import Response
+
+from scrappit.api import RedditAPI, TokenBucket
+
+
+def make_response(status_code: int, remaining: str, reset: str) -> Response:
+    response = Response()
+    response.status_code = status_code
+    response.headers["X-Ratelimit-Remaining"] = remaining
+    response.headers["X-Ratelimit-Used"] = "100"
+    response.headers["X-Ratelimit-Reset"] = reset
+    response._content = b'{"data": {}}'
+    return response
+
+
+def test_bucket_waits_when_empty() -> None:
+    bucket = TokenBucket(2, 1)
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(1, abs=0.01)
+    assert bucket.acquire() == pytest.approx(2, abs=0.01)
+
+
+def test_bucket_update_keeps_reservations() -> None:
+    bucket = TokenBucket(100, 1)
+
+    for _ in range(3):
+        bucket.acquire()
+
+    bucket.release()
+    bucket.update(10, 90, 60, monotonic())
+    assert bucket.tokens == 8
+
+
+def test_bucket_wait_capped_at_reset() -> None:
+    bucket = TokenBucket(100, 1)
+
+    for _ in range(4):
+        bucket.acquire()
+
+    bucket.update(0, 100, 300, monotonic())
+    assert bucket.tokens == -4
+    assert 299 <= bucket.acquire() <= 300
+
+
+def test_bucket_refills_after_reset() -> None:
+    bucket = TokenBucket(100, 1)
+    bucket.update(0, 100, 0, monotonic())
+    assert bucket.acquire() == 0
+    assert bucket.tokens == 99
+
+
+def test_bucket_capacity_from_headers() -> None:
+    bucket = TokenBucket(100, 1)
+    bucket.update(500, 100, 600, monotonic())
+    assert bucket.capacity == 600
+    bucket.acquire()
+    assert bucket.tokens == pytest.approx(499, abs=0.01)
+
+
+def test_backoff_not_overridden_by_bucket(monkeypatch: pytest.MonkeyPatch) -> None:
+    sleeps = []
+    responses = iter([make_response(429, "0", "600"), make_response(200, "99", "590")])
+    monkeypatch.setattr("scrappit.api.sleep", sleeps.append)
+    api = RedditAPI()
+    monkeypatch.setattr(api.session, "send", lambda request, **kwargs: next(responses))
+    assert api.get("/r/python/about") == {"data": {}}
+    assert len(sleeps) == 1
+    assert RedditAPI.TIMEOUT <= sleeps[0] <= RedditAPI.TIMEOUT + RedditAPI.JITTER
+    assert api.throttle_streak == 0
+
+
+def test_missing_ratelimit_headers(monkeypatch: pytest.MonkeyPatch) -> None:
+    response = make_response(200, "50", "60")
+    del response.headers["X-Ratelimit-Reset"]
+    api = RedditAPI()
+    monkeypatch.setattr(api.session, "send", lambda request, **kwargs: response)
+    assert api.get("/r/python/about") == {"data": {}}
+    assert api.reset_time == 0
+    assert api.bucket.reset_time == 0
+    assert api.bucket.capacity == RedditAPI.RATE_LIMIT
+    assert api.bucket.rate == RedditAPI.RATE_LIMIT / RedditAPI.RATE_PERIOD
+    assert api.bucket.tokens == pytest.approx(RedditAPI.RATE_LIMIT - 1, abs=0.01)
+
+
+def test_fractional_ratelimit_reset(monkeypatch: pytest.MonkeyPatch) -> None:
+    api = RedditAPI()
+    monkeypatch.setattr(api.session, "send", lambda request, **kwargs: make_response(200, "50.0", "12.5"))
+    api.get("/r/python/about")
+    assert api.reset_time - monotonic() == pytest.approx(12.5, abs=0.1)
+    assert api.bucket.rate == 4
+    assert api.bucket.tokens == 50
@@ -0,0 +1,294 @@
+# Scrappit, Simple Reddit Scraper
+# Copyright (C) 2024  Natan Junges <natanajunges@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from threading import Barrier, Event
+from time import monotonic, sleep
+
+import pytest
+
+from scrappit.scheduler import ScrappitResult, ScrappitScheduler, ScrappitTask
+
+TIMEOUT = 5
+
+
+def make_scheduler(workers: int = 1, **stubs) -> ScrappitScheduler:
+    scheduler = ScrappitScheduler(workers)
+    scheduler.dispatch.update(stubs)
+    return scheduler
+
+
+def collect(scheduler: ScrappitScheduler, count: int) -> list[ScrappitResult]:
+    results = []
+    deadline = monotonic() + TIMEOUT
+
+    while len(results) < count and monotonic() < deadline:
+        result = scheduler.get_result()
+
+        if result is None:
+            sleep(0.01)
+        else:
+            results.append(result)
+
+    return results
+
+
+def shutdown(scheduler: ScrappitScheduler) -> None:
+    scheduler.stop()
+    scheduler.join(TIMEOUT)
+    assert not scheduler.is_alive()
+
+
+def test_invalid_workers() -> None:
+    with pytest.raises(ValueError):
+        ScrappitScheduler(0)
+
+
+def test_unknown_task() -> None:
+    scheduler = make_scheduler()
+
+    with pytest.raises(ValueError):
+        scheduler.put_task(ScrappitTask("nope", ()))
+
+    assert not scheduler.task_heap
+
+
+def test_workers_run_concurrently() -> None:
+    barrier = Barrier(3, timeout=TIMEOUT)
+    scheduler = make_scheduler(3, get=lambda endpoint: barrier.wait())
+    scheduler.start()
+
+    for i in range(3):
+        scheduler.get(f"/{i}")
+
+    results = collect(scheduler, 3)
+    shutdown(scheduler)
+    assert len(results) == 3
+    assert not any(isinstance(result.value, Exception) for result in results)
+
+
+def test_tasks_run_by_priority() -> None:
+    started = Event()
+    release = Event()
+    order = []
+
+    def get(endpoint: str) -> str:
+        if endpoint == "/block":
+            started.set()
+            release.wait(TIMEOUT)
+
+        order.append(endpoint)
+        return endpoint
+
+    scheduler = make_scheduler(get=get)
+    scheduler.start()
+    scheduler.get("/block")
+    assert started.wait(TIMEOUT)
+    scheduler.get("/d", priority=0.9)
+    scheduler.get("/a", priority=0.1)
+    scheduler.get("/b", priority=0.5)
+    scheduler.get("/c", priority=0.5)
+    release.set()
+    collect(scheduler, 5)
+    shutdown(scheduler)
+    assert order == ["/block", "/a", "/b", "/c", "/d"]
+
+
+def test_stop_wakes_blocked_worker() -> None:
+    scheduler = make_scheduler()
+    scheduler.start()
+    sleep(0.05)
+    start = monotonic()
+    shutdown(scheduler)
+    assert monotonic() - start < 0.5
+
+
+def test_duplicates_are_coalesced() -> None:
+    release = Event()
+    calls = []
+
+    def get(endpoint: str) -> dict:
+        calls.append(endpoint)
+        release.wait(TIMEOUT)
+        return {"endpoint": endpoint}
+
+    scheduler = make_scheduler(get=get)
+    tasks = [scheduler.get("/a"), scheduler.get("/a"), scheduler.get("/b")]
+    scheduler.start()
+    release.set()
+    results = collect(scheduler, 3)
+    shutdown(scheduler)
+    assert calls == ["/a", "/b"]
+    assert sorted(result.task.task_id for result in results) == [task.task_id for task in tasks]
+    a_results = [result.value for result in results if result.value == {"endpoint": "/a"}]
+    assert len(a_results) == 2
+    assert a_results[0] is not a_results[1]
+
+
+def test_coalesced_results_are_independent() -> None:
+    release = Event()
+
+    def get(endpoint: str) -> dict:
+        release.wait(TIMEOUT)
+        return {"data": {"children": [1, 2, 3]}}
+
+    scheduler = make_scheduler(get=get)
+    scheduler.start()
+
+    for _ in range(3):
+        scheduler.get("/a")
+
+    release.set()
+    results = collect(scheduler, 3)
+    shutdown(scheduler)
+    results[0].value["data"].clear()
+    assert [result.value for result in results[1:]] == [{"data": {"children": [1, 2, 3]}}] * 2
+
+
+def test_non_listing_data_is_not_paginated() -> None:
+    scheduler = make_scheduler(r_about=lambda subreddit: {"data": {"after": "t3_1"}})
+    scheduler.start()
+    scheduler.r_about("python")
+    scheduler.r_about("rust")
+    results = collect(scheduler, 2)
+    shutdown(scheduler)
+    assert len(results) == 2
+
+
+def test_duplicate_raises_priority() -> None:
+    started = Event()
+    release = Event()
+    order = []
+
+    def get(endpoint: str) -> str:
+        if endpoint == "/block":
+            started.set()
+            release.wait(TIMEOUT)
+
+        order.append(endpoint)
+        return endpoint
+
+    scheduler = make_scheduler(get=get)
+    scheduler.start()
+    scheduler.get("/block")
+    assert started.wait(TIMEOUT)
+    scheduler.get("/a", priority=0.9)
+    scheduler.get("/b", priority=0.5)
+    scheduler.get("/a", priority=0.0)
+    release.set()
+    collect(scheduler, 4)
+    shutdown(scheduler)
+    assert order == ["/block", "/a", "/b"]
+
+
+def test_pagination_follows_cursor() -> None:
+    calls = []
+
+    def listing(endpoint: str, before: str | None, after: str | None) -> dict:
+        calls.append(after)
+        return {"data": {"after": f"t3_{len(calls)}", "before": None}}
+
+    scheduler = make_scheduler(listing=listing)
+    scheduler.start()
+    scheduler.listing("/r/python/new", max_pages=3)
+    results = collect(scheduler, 3)
+    shutdown(scheduler)
+    assert len(results) == 3
+    assert calls == [None, "t3_1", "t3_2"]
+
+
+def test_pagination_survives_non_listing() -> None:
+    scheduler = make_scheduler(r=lambda *args: {"error": 404}, get=lambda endpoint: endpoint)
+    scheduler.start()
+    scheduler.r("python", max_pages=3)
+    assert len(collect(scheduler, 1)) == 1
+    scheduler.get("/after")
+    results = collect(scheduler, 1)
+    shutdown(scheduler)
+    assert [result.value for result in results] == ["/after"]
+
+
+def test_only_listings_can_be_paginated() -> None:
+    scheduler = make_scheduler()
+
+    with pytest.raises(ValueError):
+        scheduler.put_task(ScrappitTask("get", ("/x",)), 3)
+
+
+def test_unencodable_coalesced_value() -> None:
+    release = Event()
+
+    def get(endpoint: str) -> object:
+        release.wait(TIMEOUT)
+        return object()
+
+    scheduler = make_scheduler(get=get)
+    scheduler.start()
+    scheduler.get("/a")
+    scheduler.get("/a")
+    release.set()
+    results = collect(scheduler, 2)
+    scheduler.get("/b")
+    results += collect(scheduler, 1)
+    shutdown(scheduler)
+    assert len(results) == 3
+    assert all(isinstance(result.value, Exception) for result in results[:2])
+
+
+def test_pages_carry_origin_id() -> None:
+    pages = iter(["t3_1", "t3_2", None])
+    scheduler = make_scheduler(listing=lambda *args: {"data": {"after": next(pages)}})
+    scheduler.start()
+    task = scheduler.listing("/r/python/new", max_pages=5)
+    results = collect(scheduler, 3)
+    shutdown(scheduler)
+    assert len(results) == 3
+    assert {result.task.origin_id for result in results} == {task.task_id}
+
+
+def test_stop_with_full_result_queue() -> None:
+    scheduler = make_scheduler(get=lambda endpoint: endpoint)
+    scheduler.start()
+
+    for i in range(ScrappitScheduler.RESULT_QUEUE_SIZE + 6):
+        scheduler.get(f"/{i}")
+
+    deadline = monotonic() + TIMEOUT
+
+    while not scheduler.result_queue.full() and monotonic() < deadline:
+        sleep(0.01)
+
+    assert scheduler.result_queue.full()
+    shutdown(scheduler)
+
+
+def test_full_result_queue_applies_back_pressure() -> None:
+    count = ScrappitScheduler.RESULT_QUEUE_SIZE + 6
+    scheduler = make_scheduler(get=lambda endpoint: endpoint)
+    scheduler.start()
+
+    for i in range(count):
+        scheduler.get(f"/{i}")
+
+    deadline = monotonic() + TIMEOUT
+
+    while not scheduler.result_queue.full() and monotonic() < deadline:
+        sleep(0.01)
+
+    sleep(0.05)
+    assert scheduler.result_queue.qsize() == ScrappitScheduler.RESULT_QUEUE_SIZE
+    results = collect(scheduler, count)
+    shutdown(scheduler)
+    assert len(results) == count